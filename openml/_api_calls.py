@@ -3,6 +3,8 @@
 import time
 import hashlib
 import logging
+import os
+import threading
 import requests
 import xmltodict
 from typing import Dict, Optional
@@ -187,6 +189,37 @@ def __read_url(url, request_method, data=None):
     return __send_request(request_method=request_method, url=url, data=data)
 
 
+# One session per thread and process, so that consecutive API calls reuse their connections
+# (HTTP keep-alive) instead of connecting anew for every call. A requests.Session is not
+# guaranteed to be thread-safe, and connections must not be shared with forked processes.
+_session_store = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """Return the session of the current thread.
+
+    A new session is created when the server or the API key were changed since the last call.
+    Cookies are cleared, so that no state is passed from one API call to the next.
+    """
+    key = (os.getpid(), config.server, config.apikey)
+    session = getattr(_session_store, 'session', None)
+    if session is None or _session_store.key != key:
+        _close_session()
+        session = requests.Session()
+        _session_store.session = session
+        _session_store.key = key
+    session.cookies.clear()
+    return session
+
+
+def _close_session() -> None:
+    session = getattr(_session_store, 'session', None)
+    if session is not None:
+        if _session_store.key[0] == os.getpid():
+            session.close()
+        _session_store.session = None
+
+
 def __send_request(
     request_method,
     url,
@@ -195,27 +228,29 @@ def __send_request(
 ):
     n_retries = config.connection_n_retries
     response = None
-    with requests.Session() as session:
-        # Start at one to have a non-zero multiplier for the sleep
-        for i in range(1, n_retries + 1):
-            try:
-                if request_method == 'get':
-                    response = session.get(url, params=data)
-                elif request_method == 'delete':
-                    response = session.delete(url, params=data)
-                elif request_method == 'post':
-                    response = session.post(url, data=data, files=files)
-                else:
-                    raise NotImplementedError()
-                break
-            except (
-                    requests.exceptions.ConnectionError,
-                    requests.exceptions.SSLError,
-            ) as e:
-                if i == n_retries:
-                    raise e
-                else:
-                    time.sleep(0.1 * i)
+    # Start at one to have a non-zero multiplier for the sleep
+    for i in range(1, n_retries + 1):
+        session = _get_session()
+        try:
+            if request_method == 'get':
+                response = session.get(url, params=data)
+            elif request_method == 'delete':
+                response = session.delete(url, params=data)
+            elif request_method == 'post':
+                response = session.post(url, data=data, files=files)
+            else:
+                raise NotImplementedError()
+            break
+        except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.SSLError,
+        ) as e:
+            # do not reuse the connections of the failed session for the next attempt
+            _close_session()
+            if i == n_retries:
+                raise e
+            else:
+                time.sleep(0.1 * i)
     if response is None:
         raise ValueError('This should never happen!')
     return response
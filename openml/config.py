@@ -83,6 +83,7 @@ _defaults = {
     'cachedir': os.path.expanduser(os.path.join('~', '.openml', 'cache')),
     'avoid_duplicate_runs': 'True',
     'connection_n_retries': 2,
+    'n_download_workers': 8,
 }
 
 config_file = os.path.expanduser(os.path.join('~', '.openml', 'config'))
@@ -112,6 +113,9 @@ avoid_duplicate_runs = True if _defaults['avoid_duplicate_runs'] == 'True' else
 # Number of retries if the connection breaks
 connection_n_retries = _defaults['connection_n_retries']
 
+# Maximal number of threads used to download several entities (e.g. runs) at once
+n_download_workers = _defaults['n_download_workers']
+
 
 class ConfigurationForExamples:
     """ Allows easy switching to and from a test configuration, used for examples. """
@@ -175,6 +179,7 @@ def _setup():
     global cache_directory
     global avoid_duplicate_runs
     global connection_n_retries
+    global n_download_workers
 
     # read config file, create cache directory
     try:
@@ -205,6 +210,9 @@ def _setup():
             'A higher number of retries than 20 is not allowed to keep the '
             'server load reasonable'
         )
+    n_download_workers = config.getint('FAKE_SECTION', 'n_download_workers')
+    if n_download_workers < 1:
+        raise ValueError('n_download_workers must be at least 1')
 
 
 def _parse_config():
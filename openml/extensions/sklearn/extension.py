@@ -1620,8 +1620,7 @@ class SklearnExtension(Extension):
                     # for class 3 because the rest of the library expects that the
                     # probabilities are ordered the same way as the classes are ordered).
                     proba_y_new = np.zeros((proba_y.shape[0], len(task.class_labels)))
-                    for idx, model_class in enumerate(model_classes):
-                        proba_y_new[:, model_class] = proba_y[:, idx]
+                    proba_y_new[:, model_classes] = proba_y[:, :len(model_classes)]
                     proba_y = proba_y_new
 
                 if proba_y.shape[1] != len(task.class_labels):
@@ -1872,23 +1871,25 @@ class SklearnExtension(Extension):
         return base_estimator
 
     def _extract_trace_data(self, model, rep_no, fold_no):
+        cv_results = model.cv_results_
+        test_scores = cv_results['mean_test_score']
+        # the parameter columns are the same for every iteration
+        param_columns = [cv_results[key] for key in cv_results if key.startswith('param_')]
         arff_tracecontent = []
-        for itt_no in range(0, len(model.cv_results_['mean_test_score'])):
+        for itt_no in range(0, len(test_scores)):
             # we use the string values for True and False, as it is defined in
             # this way by the OpenML server
             selected = 'false'
             if itt_no == model.best_index_:
                 selected = 'true'
-            test_score = model.cv_results_['mean_test_score'][itt_no]
-            arff_line = [rep_no, fold_no, itt_no, test_score, selected]
-            for key in model.cv_results_:
-                if key.startswith('param_'):
-                    value = model.cv_results_[key][itt_no]
-                    if value is not np.ma.masked:
-                        serialized_value = json.dumps(value)
-                    else:
-                        serialized_value = np.nan
-                    arff_line.append(serialized_value)
+            arff_line = [rep_no, fold_no, itt_no, test_scores[itt_no], selected]
+            for param_column in param_columns:
+                value = param_column[itt_no]
+                if value is not np.ma.masked:
+                    serialized_value = json.dumps(value)
+                else:
+                    serialized_value = np.nan
+                arff_line.append(serialized_value)
             arff_tracecontent.append(arff_line)
         return arff_tracecontent
 
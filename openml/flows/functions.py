@@ -7,7 +7,7 @@ import io
 import re
 import xmltodict
 import pandas as pd
-from typing import Any, Union, Dict, Optional, List
+from typing import Any, Iterator, Union, Dict, Optional, List, Tuple
 
 from ..exceptions import OpenMLCacheException
 import openml._api_calls
@@ -17,6 +17,18 @@ import openml.utils
 
 FLOWS_CACHE_DIR_NAME = 'flows'
 
+# TODO as they are actually now saved during publish, it might be good to
+# check for the equality of the keys generated by the server as well.
+_FLOW_KEYS_NOT_COMPARED = frozenset([
+    # generated by the server
+    'flow_id', 'uploader', 'version', 'upload_date',
+    # Tags aren't directly created by the server,
+    # but the uploader has no control over them!
+    'tags',
+    # ignored by the python api
+    'binary_url', 'binary_format', 'binary_md5', 'model', '_entity_id',
+])
+
 
 def _get_cached_flows() -> OrderedDict:
     """Return all the cached flows.
@@ -367,20 +379,23 @@ def __list_flows(
     return flows
 
 
+def _walk_flows(flow: OpenMLFlow) -> Iterator[OpenMLFlow]:
+    """ Yields the flow and all of its subflows, depth-first. """
+    stack = [flow]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(current.components.values())
+
+
 def _check_flow_for_server_id(flow: OpenMLFlow) -> None:
     """ Raises a ValueError if the flow or any of its subflows has no flow id. """
 
     # Depth-first search to check if all components were uploaded to the
     # server before parsing the parameters
-    stack = list()
-    stack.append(flow)
-    while len(stack) > 0:
-        current = stack.pop()
+    for current in _walk_flows(flow):
         if current.flow_id is None:
             raise ValueError("Flow %s has no flow_id!" % current.name)
-        else:
-            for component in current.components.values():
-                stack.append(component)
 
 
 def assert_flows_equal(flow1: OpenMLFlow, flow2: OpenMLFlow,
@@ -412,6 +427,28 @@ def assert_flows_equal(flow1: OpenMLFlow, flow2: OpenMLFlow,
     check_description : bool
         Whether to ignore matching of flow descriptions.
     """
+    # Compare the components iteratively, they always use the default ``check_description``.
+    flows_to_compare = [(flow1, flow2, check_description)]
+    while flows_to_compare:
+        flow1, flow2, check_description = flows_to_compare.pop()
+        _assert_flow_pair_equal(flow1, flow2, flows_to_compare,
+                                ignore_parameter_values_on_older_children,
+                                ignore_parameter_values,
+                                ignore_custom_name_if_none,
+                                check_description)
+
+
+def _assert_flow_pair_equal(flow1: OpenMLFlow, flow2: OpenMLFlow,
+                            flows_to_compare: List[Tuple[OpenMLFlow, OpenMLFlow, bool]],
+                            ignore_parameter_values_on_older_children: Optional[str],
+                            ignore_parameter_values: bool,
+                            ignore_custom_name_if_none: bool,
+                            check_description: bool) -> None:
+    """Check the equality of two flows, but not of their components.
+
+    The pairs of components to compare are appended to ``flows_to_compare``
+    instead. See ``assert_flows_equal`` for the other parameters.
+    """
     if not isinstance(flow1, OpenMLFlow):
         raise TypeError('Argument 1 must be of type OpenMLFlow, but is %s' %
                         type(flow1))
@@ -420,32 +457,26 @@ def assert_flows_equal(flow1: OpenMLFlow, flow2: OpenMLFlow,
         raise TypeError('Argument 2 must be of type OpenMLFlow, but is %s' %
                         type(flow2))
 
-    # TODO as they are actually now saved during publish, it might be good to
-    # check for the equality of these as well.
-    generated_by_the_server = ['flow_id', 'uploader', 'version', 'upload_date',
-                               # Tags aren't directly created by the server,
-                               # but the uploader has no control over them!
-                               'tags']
-    ignored_by_python_api = ['binary_url', 'binary_format', 'binary_md5',
-                             'model', '_entity_id']
-
-    for key in set(flow1.__dict__.keys()).union(flow2.__dict__.keys()):
-        if key in generated_by_the_server + ignored_by_python_api:
+    if flow1 is flow2:
+        # also holds for all of its components
+        return
+
+    attributes1 = flow1.__dict__
+    attributes2 = flow2.__dict__
+    for key in attributes1.keys() | attributes2.keys():
+        if key in _FLOW_KEYS_NOT_COMPARED:
             continue
-        attr1 = getattr(flow1, key, None)
-        attr2 = getattr(flow2, key, None)
+        attr1 = attributes1.get(key)
+        attr2 = attributes2.get(key)
         if key == 'components':
-            for name in set(attr1.keys()).union(attr2.keys()):
+            for name in attr1.keys() | attr2.keys():
                 if name not in attr1:
                     raise ValueError('Component %s only available in '
                                      'argument2, but not in argument1.' % name)
                 if name not in attr2:
                     raise ValueError('Component %s only available in '
                                      'argument2, but not in argument1.' % name)
-                assert_flows_equal(attr1[name], attr2[name],
-                                   ignore_parameter_values_on_older_children,
-                                   ignore_parameter_values,
-                                   ignore_custom_name_if_none)
+                flows_to_compare.append((attr1[name], attr2[name], True))
         elif key == '_extension':
             continue
         elif check_description and key == 'description':
@@ -513,7 +544,7 @@ def assert_flows_equal(flow1: OpenMLFlow, flow2: OpenMLFlow,
                 # the continue is to avoid the 'attr != attr2' check at end of function
                 continue
 
-            if attr1 != attr2:
+            if attr1 is not attr2 and attr1 != attr2:
                 raise ValueError("Flow %s: values for attribute '%s' differ: "
                                  "'%s'\nvs\n'%s'." %
                                  (str(flow1.name), str(key), str(attr1), str(attr2)))
@@ -7,9 +7,11 @@ from .functions import (
     run_flow_on_task,
     get_run,
     list_runs,
+    iter_runs,
     get_runs,
     get_run_trace,
     run_exists,
+    run_exists_many,
     initialize_model_from_run,
     initialize_model_from_trace,
 )
@@ -22,9 +24,11 @@ __all__ = [
     'run_flow_on_task',
     'get_run',
     'list_runs',
+    'iter_runs',
     'get_runs',
     'get_run_trace',
     'run_exists',
+    'run_exists_many',
     'initialize_model_from_run',
     'initialize_model_from_trace'
 ]
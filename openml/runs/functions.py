@@ -1,14 +1,21 @@
 # License: BSD 3-Clause
 
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+import concurrent.futures
+import functools
 import io
 import itertools
+import logging
 import os
-from typing import Any, List, Dict, Optional, Set, Tuple, Union, TYPE_CHECKING  # noqa F401
+import pickle
+import threading
+from typing import Any, DefaultDict, Iterable, Iterator, List, Dict, Optional, Set, Tuple, Union, TYPE_CHECKING  # noqa F401
 import warnings
+from xml.etree import ElementTree
 
+import joblib
+import numpy as np
 import sklearn.metrics
-import xmltodict
 import pandas as pd
 
 import openml
@@ -20,7 +27,8 @@ from openml import config
 from openml.flows.flow import _copy_server_fields
 from ..flows import get_flow, flow_exists, OpenMLFlow
 from ..setups import setup_exists, initialize_model
-from ..exceptions import OpenMLCacheException, OpenMLServerException, OpenMLRunsExistError
+from ..exceptions import OpenMLCacheException, OpenMLServerException, OpenMLServerNoResult, \
+    OpenMLRunsExistError
 from ..tasks import OpenMLTask, OpenMLClassificationTask, OpenMLClusteringTask, \
     OpenMLRegressionTask, OpenMLSupervisedTask, OpenMLLearningCurveTask
 from .run import OpenMLRun
@@ -34,6 +42,15 @@ if TYPE_CHECKING:
 # get_dict is in run.py to avoid circular imports
 
 RUNS_CACHE_DIR_NAME = 'runs'
+OPENML_NAMESPACE = '{http://openml.org/openml}'
+# the fields of a run returned by list_runs
+RUN_LISTING_COLUMNS = ('run_id', 'task_id', 'setup_id', 'flow_id', 'uploader', 'task_type',
+                       'upload_time', 'error_message')
+logger = logging.getLogger(__name__)
+
+# Flow ids confirmed by the server during this session, keyed by
+# (server, flow name, external version).
+_server_flow_ids = {}  # type: Dict[Tuple[str, str, str], int]
 
 
 def run_model_on_task(
@@ -45,6 +62,7 @@ def run_model_on_task(
     add_local_measures: bool = True,
     upload_flow: bool = False,
     return_flow: bool = False,
+    n_jobs: Optional[int] = None,
 ) -> Union[OpenMLRun, Tuple[OpenMLRun, OpenMLFlow]]:
     """Run the model on the dataset defined by the task.
 
@@ -72,6 +90,11 @@ def run_model_on_task(
         If False, do not upload the flow to OpenML.
     return_flow : bool (default=False)
         If True, returns the OpenMLFlow generated from the model in addition to the OpenMLRun.
+    n_jobs : int, optional (default=None)
+        The number of processes used to evaluate the repeats, folds and samples of the task
+        in parallel, see :class:`joblib.Parallel`. If ``None`` or ``1``, they are evaluated
+        sequentially. If ``-1``, all CPUs are used. CPU time measures are only reliable with
+        the default process-based joblib backend.
 
     Returns
     -------
@@ -115,6 +138,7 @@ def run_model_on_task(
         seed=seed,
         add_local_measures=add_local_measures,
         upload_flow=upload_flow,
+        n_jobs=n_jobs,
     )
     if return_flow:
         return run, flow
@@ -129,6 +153,7 @@ def run_flow_on_task(
     seed: int = None,
     add_local_measures: bool = True,
     upload_flow: bool = False,
+    n_jobs: Optional[int] = None,
 ) -> OpenMLRun:
 
     """Run the model provided by the flow on the dataset defined by task.
@@ -161,6 +186,11 @@ def run_flow_on_task(
     upload_flow : bool (default=False)
         If True, upload the flow to OpenML if it does not exist yet.
         If False, do not upload the flow to OpenML.
+    n_jobs : int, optional (default=None)
+        The number of processes used to evaluate the repeats, folds and samples of the task
+        in parallel, see :class:`joblib.Parallel`. If ``None`` or ``1``, they are evaluated
+        sequentially. If ``-1``, all CPUs are used. CPU time measures are only reliable with
+        the default process-based joblib backend.
 
     Returns
     -------
@@ -190,18 +220,27 @@ def run_flow_on_task(
     # or ensure no duplicate runs exist. Otherwise it can be synced at upload time.
     flow_id = None
     if upload_flow or avoid_duplicate_runs:
-        flow_id = flow_exists(flow.name, flow.external_version)
-        if isinstance(flow.flow_id, int) and flow_id != flow.flow_id:
+        flow_key = (config.server, flow.name, flow.external_version)
+        if isinstance(flow.flow_id, int) and _server_flow_ids.get(flow_key) == flow.flow_id:
+            # The flow id was already checked against the server in this session, e.g. when
+            # running the same flow with different hyperparameters in a loop.
+            flow_id = flow.flow_id
+        else:
+            flow_id = flow_exists(flow.name, flow.external_version)
+            if isinstance(flow.flow_id, int) and flow_id != flow.flow_id:
+                if flow_id:
+                    raise PyOpenMLError("Local flow_id does not match server flow_id: "
+                                        "'{}' vs '{}'".format(flow.flow_id, flow_id))
+                else:
+                    raise PyOpenMLError("Flow does not exist on the server, "
+                                        "but 'flow.flow_id' is not None.")
             if flow_id:
-                raise PyOpenMLError("Local flow_id does not match server flow_id: "
-                                    "'{}' vs '{}'".format(flow.flow_id, flow_id))
-            else:
-                raise PyOpenMLError("Flow does not exist on the server, "
-                                    "but 'flow.flow_id' is not None.")
+                _server_flow_ids[flow_key] = flow_id
 
         if upload_flow and not flow_id:
             flow.publish()
             flow_id = flow.flow_id
+            _server_flow_ids[flow_key] = flow_id
         elif flow_id:
             flow_from_server = get_flow(flow_id)
             _copy_server_fields(flow_from_server, flow)
@@ -231,6 +270,7 @@ def run_flow_on_task(
         task=task,
         extension=flow.extension,
         add_local_measures=add_local_measures,
+        n_jobs=n_jobs,
     )
 
     data_content, trace, fold_evaluations, sample_evaluations = res
@@ -370,20 +410,43 @@ def run_exists(task_id: int, setup_id: int) -> Set[int]:
         Set run ids for runs where flow setup_id was run on task_id. Empty
         set if it wasn't run yet.
     """
-    if setup_id <= 0:
-        # openml setups are in range 1-inf
-        return set()
+    return run_exists_many(task_id, [setup_id]).get(setup_id, set())
+
+
+def run_exists_many(task_id: int, setup_ids: List[int]) -> Dict[int, Set[int]]:
+    """Checks which of several setups are already present on the server
+    for a task.
+
+    All setups are checked with a single listing call, which is much cheaper
+    than calling ``run_exists`` once per setup.
+
+    Parameters
+    ----------
+    task_id : int
+
+    setup_ids : List[int]
+
+    Returns
+    -------
+        Dict mapping each setup id that was run on task_id to the set of
+        run ids of these runs. Setups that weren't run yet are omitted.
+    """
+    # openml setups are in range 1-inf
+    setup_ids = [setup_id for setup_id in setup_ids if setup_id > 0]
+    if len(setup_ids) == 0:
+        return {}
 
     try:
-        result = list_runs(task=[task_id], setup=[setup_id])
-        if len(result) > 0:
-            return set(result.keys())
-        else:
-            return set()
+        result = list_runs(task=[task_id], setup=setup_ids)
     except OpenMLServerException as exception:
         # error code 512 implies no results. The run does not exist yet
         assert (exception.code == 512)
-        return set()
+        return {}
+
+    runs_per_setup = {}  # type: Dict[int, Set[int]]
+    for run_id, run in result.items():
+        runs_per_setup.setdefault(run['setup_id'], set()).add(run_id)
+    return runs_per_setup
 
 
 def _run_task_get_arffcontent(
@@ -392,6 +455,7 @@ def _run_task_get_arffcontent(
     task: OpenMLTask,
     extension: 'Extension',
     add_local_measures: bool,
+    n_jobs: Optional[int] = None,
 ) -> Tuple[
     List[List],
     Optional[OpenMLRunTrace],
@@ -404,144 +468,214 @@ def _run_task_get_arffcontent(
     # this information is multiple times overwritten, but due to the ordering
     # of tne loops, eventually it contains the information based on the full
     # dataset size
-    user_defined_measures_per_fold = OrderedDict()  # type: 'OrderedDict[str, OrderedDict]'
+    # (measure -> repeat -> fold -> value)
+    user_defined_measures_per_fold = defaultdict(
+        lambda: defaultdict(OrderedDict)
+    )  # type: DefaultDict[str, DefaultDict[int, OrderedDict]]
     # stores sample-based evaluation measures (sublevel of fold-based)
     # will also be filled on a non sample-based task, but the information
     # is the same as the fold-based measures, and disregarded in that case
-    user_defined_measures_per_sample = OrderedDict()  # type: 'OrderedDict[str, OrderedDict]'
+    # (measure -> repeat -> fold -> sample -> value)
+    user_defined_measures_per_sample = defaultdict(
+        lambda: defaultdict(lambda: defaultdict(OrderedDict))
+    )  # type: DefaultDict[str, DefaultDict[int, DefaultDict[int, OrderedDict]]]
 
     # TODO use different iterator to only provide a single iterator (less
     # methods, less maintenance, less confusion)
     num_reps, num_folds, num_samples = task.get_split_dimensions()
 
-    for n_fit, (rep_no, fold_no, sample_no) in enumerate(itertools.product(
-        range(num_reps),
-        range(num_folds),
-        range(num_samples),
-    ), start=1):
-
-        train_indices, test_indices = task.get_train_test_split_indices(
-            repeat=rep_no, fold=fold_no, sample=sample_no)
-        if isinstance(task, OpenMLSupervisedTask):
-            x, y = task.get_X_and_y(dataset_format='array')
-            train_x = x[train_indices]
-            train_y = y[train_indices]
-            test_x = x[test_indices]
-            test_y = y[test_indices]
-        elif isinstance(task, OpenMLClusteringTask):
-            x = task.get_X(dataset_format='array')
-            train_x = x[train_indices]
-            train_y = None
-            test_x = None
-            test_y = None
-        else:
-            raise NotImplementedError(task.task_type)
+    # the data and the class labels are the same for every repeat, fold and
+    # sample, so they are only loaded (and converted) once
+    if isinstance(task, OpenMLSupervisedTask):
+        x, y = task.get_X_and_y(dataset_format='array')
+    elif isinstance(task, OpenMLClusteringTask):
+        x = task.get_X(dataset_format='array')
+        y = None
+    else:
+        raise NotImplementedError(task.task_type)
+
+    # the kind of task decides how the predictions are stored, it is resolved
+    # once here instead of for every repeat, fold and sample
+    class_labels = None  # type: Optional[np.ndarray]
+    if isinstance(task, (OpenMLClassificationTask, OpenMLLearningCurveTask)):
+        task_kind = TaskTypeEnum.SUPERVISED_CLASSIFICATION
+        if task.class_labels is None:
+            raise ValueError('The task has no class labels')
+        class_labels = np.asarray(task.class_labels, dtype=object)
+    elif isinstance(task, OpenMLRegressionTask):
+        task_kind = TaskTypeEnum.SUPERVISED_REGRESSION
+    elif isinstance(task, OpenMLClusteringTask):
+        task_kind = TaskTypeEnum.CLUSTERING
+    else:
+        raise TypeError(type(task))
 
-        config.logger.info(
-            "Going to execute flow '%s' on task %d for repeat %d fold %d sample %d.",
-            flow.name, task.task_id, rep_no, fold_no, sample_no,
+    run_fold = functools.partial(
+        _run_fold,
+        extension=extension,
+        model=model,
+        task=task,
+        task_kind=task_kind,
+        class_labels=class_labels,
+        x=x,
+        y=y,
+        add_local_measures=add_local_measures,
+        flow_name=flow.name,
+    )
+    splits = list(itertools.product(range(num_reps), range(num_folds), range(num_samples)))
+    n_fit = len(splits)
+    if n_jobs is None or n_jobs == 1:
+        fold_results = (
+            run_fold(
+                rep_no, fold_no, sample_no,
+                *task.get_train_test_split_indices(repeat=rep_no, fold=fold_no, sample=sample_no)
+            )
+            for rep_no, fold_no, sample_no in splits
+        )  # type: Iterable[Tuple[List[List], OrderedDict, Optional[OpenMLRunTrace]]]
+    else:
+        fold_results = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(run_fold)(
+                rep_no, fold_no, sample_no,
+                *task.get_train_test_split_indices(repeat=rep_no, fold=fold_no, sample=sample_no)
+            )
+            for rep_no, fold_no, sample_no in splits
         )
 
-        (
-            pred_y,
-            proba_y,
-            user_defined_measures_fold,
-            trace,
-        ) = extension._run_model_on_fold(
-            model=model,
-            task=task,
-            X_train=train_x,
-            y_train=train_y,
-            rep_no=rep_no,
-            fold_no=fold_no,
-            X_test=test_x,
-        )
+    for (rep_no, fold_no, sample_no), (arff_lines, user_defined_measures_fold, trace) in zip(
+        splits, fold_results,
+    ):
+        arff_datacontent.extend(arff_lines)
         if trace is not None:
             traces.append(trace)
 
-        # add client-side calculated metrics. These is used on the server as
-        # consistency check, only useful for supervised tasks
-        def _calculate_local_measure(sklearn_fn, openml_name):
-            user_defined_measures_fold[openml_name] = sklearn_fn(test_y, pred_y)
-
-        if isinstance(task, (OpenMLClassificationTask, OpenMLLearningCurveTask)):
+        for measure, value in user_defined_measures_fold.items():
+            user_defined_measures_per_fold[measure][rep_no][fold_no] = value
+            user_defined_measures_per_sample[measure][rep_no][fold_no][sample_no] = value
 
-            for i, tst_idx in enumerate(test_indices):
-
-                arff_line = [rep_no, fold_no, sample_no, tst_idx]  # type: List[Any]
-                if task.class_labels is not None:
-                    for j, class_label in enumerate(task.class_labels):
-                        arff_line.append(proba_y[i][j])
-
-                    arff_line.append(task.class_labels[pred_y[i]])
-                    arff_line.append(task.class_labels[test_y[i]])
-                else:
-                    raise ValueError('The task has no class labels')
-
-                arff_datacontent.append(arff_line)
+    if len(traces) > 0:
+        if len(traces) != n_fit:
+            raise ValueError(
+                'Did not find enough traces (expected {}, found {})'.format(n_fit, len(traces))
+            )
+        else:
+            trace = OpenMLRunTrace.merge_traces(traces)
+    else:
+        trace = None
 
-            if add_local_measures:
-                _calculate_local_measure(
-                    sklearn.metrics.accuracy_score,
-                    'predictive_accuracy',
-                )
+    return (
+        arff_datacontent,
+        trace,
+        _to_ordered_dict(user_defined_measures_per_fold),
+        _to_ordered_dict(user_defined_measures_per_sample),
+    )
 
-        elif isinstance(task, OpenMLRegressionTask):
 
-            for i in range(0, len(test_indices)):
-                arff_line = [rep_no, fold_no, test_indices[i], pred_y[i], test_y[i]]
-                arff_datacontent.append(arff_line)
+def _run_fold(
+    rep_no: int,
+    fold_no: int,
+    sample_no: int,
+    train_indices: np.ndarray,
+    test_indices: np.ndarray,
+    extension: 'Extension',
+    model: Any,
+    task: OpenMLTask,
+    task_kind: int,
+    class_labels: Optional[np.ndarray],
+    x: Any,
+    y: Any,
+    add_local_measures: bool,
+    flow_name: str,
+) -> Tuple[List[List], 'OrderedDict[str, float]', Optional[OpenMLRunTrace]]:
+    """Run the model on a single repeat, fold and sample of the task.
 
-            if add_local_measures:
-                _calculate_local_measure(
-                    sklearn.metrics.mean_absolute_error,
-                    'mean_absolute_error',
-                )
+    Returns the prediction rows of the fold, the measures of the fold and the
+    trace (if any).
+    """
+    train_x = x[train_indices]
+    if task_kind != TaskTypeEnum.CLUSTERING:
+        train_y = y[train_indices]
+        test_x = x[test_indices]
+        test_y = y[test_indices]
+    else:
+        train_y = None
+        test_x = None
+        test_y = None
 
-        elif isinstance(task, OpenMLClusteringTask):
-            for i in range(0, len(test_indices)):
-                arff_line = [test_indices[i], pred_y[i]]  # row_id, cluster ID
-                arff_datacontent.append(arff_line)
+    config.logger.info(
+        "Going to execute flow '%s' on task %d for repeat %d fold %d sample %d.",
+        flow_name, task.task_id, rep_no, fold_no, sample_no,
+    )
 
-        else:
-            raise TypeError(type(task))
+    (
+        pred_y,
+        proba_y,
+        user_defined_measures_fold,
+        trace,
+    ) = extension._run_model_on_fold(
+        model=model,
+        task=task,
+        X_train=train_x,
+        y_train=train_y,
+        rep_no=rep_no,
+        fold_no=fold_no,
+        X_test=test_x,
+    )
 
-        for measure in user_defined_measures_fold:
+    # add client-side calculated metrics. These is used on the server as
+    # consistency check, only useful for supervised tasks
+    def _calculate_local_measure(sklearn_fn, openml_name):
+        user_defined_measures_fold[openml_name] = sklearn_fn(test_y, pred_y)
+
+    if task_kind == TaskTypeEnum.SUPERVISED_CLASSIFICATION:
+        if class_labels is None:
+            raise ValueError('The task has no class labels')
+        n_classes = len(class_labels)
+
+        # build all rows of the fold at once: repeat, fold, sample, row_id,
+        # one confidence per class, prediction and correct label
+        arff_lines = np.empty((len(test_indices), 4 + n_classes + 2), dtype=object)
+        arff_lines[:, 0] = rep_no
+        arff_lines[:, 1] = fold_no
+        arff_lines[:, 2] = sample_no
+        arff_lines[:, 3] = test_indices
+        arff_lines[:, 4:4 + n_classes] = proba_y[:, :n_classes]
+        arff_lines[:, -2] = class_labels[pred_y]
+        arff_lines[:, -1] = class_labels[test_y]
+
+        if add_local_measures:
+            _calculate_local_measure(
+                sklearn.metrics.accuracy_score,
+                'predictive_accuracy',
+            )
 
-            if measure not in user_defined_measures_per_fold:
-                user_defined_measures_per_fold[measure] = OrderedDict()
-            if rep_no not in user_defined_measures_per_fold[measure]:
-                user_defined_measures_per_fold[measure][rep_no] = OrderedDict()
+    elif task_kind == TaskTypeEnum.SUPERVISED_REGRESSION:
 
-            if measure not in user_defined_measures_per_sample:
-                user_defined_measures_per_sample[measure] = OrderedDict()
-            if rep_no not in user_defined_measures_per_sample[measure]:
-                user_defined_measures_per_sample[measure][rep_no] = OrderedDict()
-            if fold_no not in user_defined_measures_per_sample[measure][rep_no]:
-                user_defined_measures_per_sample[measure][rep_no][fold_no] = OrderedDict()
+        arff_lines = np.empty((len(test_indices), 5), dtype=object)
+        arff_lines[:, 0] = rep_no
+        arff_lines[:, 1] = fold_no
+        arff_lines[:, 2] = test_indices
+        arff_lines[:, 3] = pred_y
+        arff_lines[:, 4] = test_y
 
-            user_defined_measures_per_fold[measure][rep_no][fold_no] = (
-                user_defined_measures_fold[measure]
-            )
-            user_defined_measures_per_sample[measure][rep_no][fold_no][sample_no] = (
-                user_defined_measures_fold[measure]
+        if add_local_measures:
+            _calculate_local_measure(
+                sklearn.metrics.mean_absolute_error,
+                'mean_absolute_error',
             )
 
-    if len(traces) > 0:
-        if len(traces) != n_fit:
-            raise ValueError(
-                'Did not find enough traces (expected {}, found {})'.format(n_fit, len(traces))
-            )
-        else:
-            trace = OpenMLRunTrace.merge_traces(traces)
     else:
-        trace = None
+        # row_id, cluster ID
+        arff_lines = np.empty((len(test_indices), 2), dtype=object)
+        arff_lines[:, 0] = test_indices
+        arff_lines[:, 1] = pred_y[:len(test_indices)]
 
-    return (
-        arff_datacontent,
-        trace,
-        user_defined_measures_per_fold,
-        user_defined_measures_per_sample,
+    return arff_lines.tolist(), user_defined_measures_fold, trace
+
+
+def _to_ordered_dict(nested: Dict) -> 'OrderedDict':
+    """Recursively convert nested (default) dicts to ``OrderedDict``, keeping the key order."""
+    return OrderedDict(
+        (key, _to_ordered_dict(value) if isinstance(value, dict) else value)
+        for key, value in nested.items()
     )
 
 
@@ -556,12 +690,30 @@ def get_runs(run_ids):
     -------
     runs : list of OpenMLRun
         List of runs corresponding to IDs, fetched from the server.
+
+    Notes
+    -----
+    The runs are fetched concurrently by at most ``openml.config.n_download_workers``
+    threads. The order of the returned runs matches the order of ``run_ids``. A run id
+    which is given several times is fetched once, and the same run object is returned
+    at each of its positions.
+
+    Threads which fetch the same run, task, dataset or flow are serialized, so that they
+    do not write the same cache directory at the same time.
+
+    If only the run metadata (task, setup, flow, uploader, ...) is needed,
+    ``list_runs(id=run_ids)`` retrieves it for all runs in a single request.
     """
 
-    runs = []
-    for run_id in run_ids:
-        runs.append(get_run(run_id))
-    return runs
+    run_ids = list(run_ids)
+    if len(run_ids) == 0:
+        return []
+
+    unique_run_ids = list(OrderedDict.fromkeys(run_ids))
+    n_workers = min(config.n_download_workers, len(unique_run_ids))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_workers) as executor:
+        runs = dict(zip(unique_run_ids, executor.map(get_run, unique_run_ids)))
+    return [runs[run_id] for run_id in run_ids]
 
 
 @openml.utils.thread_safe_if_oslo_installed
@@ -576,8 +728,6 @@ def get_run(run_id: int, ignore_cache: bool = False) -> OpenMLRun:
         Whether to ignore the cache. If ``true`` this will download and overwrite the run xml
         even if the requested run is already cached.
 
-    ignore_cache
-
     Returns
     -------
     run : OpenMLRun
@@ -598,14 +748,34 @@ def get_run(run_id: int, ignore_cache: bool = False) -> OpenMLRun:
 
     except OpenMLCacheException:
         run_xml = openml._api_calls._perform_api_call("run/%d" % run_id, 'get')
-        with io.open(run_file, "w", encoding='utf8') as fh:
-            fh.write(run_xml)
-
-    run = _create_run_from_xml(run_xml)
+        # parse before caching, so that a description which cannot be parsed is never cached
+        run = _create_run_from_xml(run_xml)
+        # write to a temporary file first, so that the cache never holds a partial description
+        tmp_file = _get_temporary_file_name(run_file)
+        try:
+            with io.open(tmp_file, "w", encoding='utf8') as fh:
+                fh.write(run_xml)
+            os.replace(tmp_file, run_file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        # the pickled parse of a previous description must not shadow the new one
+        pickle_file = _get_run_pickle_file(run_file)
+        if os.path.exists(pickle_file):
+            os.remove(pickle_file)
 
     return run
 
 
+def _get_temporary_file_name(file_name: str) -> str:
+    """ Name of a temporary file to write ``file_name`` through, unique per process and thread.
+
+    Unlike ``tempfile.mkstemp`` the file is created with the default permissions,
+    so that a shared cache directory stays readable.
+    """
+    return '%s.%d.%d.tmp' % (file_name, os.getpid(), threading.get_ident())
+
+
 def _create_run_from_xml(xml, from_server=True):
     """Create a run object from xml returned from server.
 
@@ -638,8 +808,7 @@ def _create_run_from_xml(xml, from_server=True):
             raise AttributeError('Run XML does not contain required (server) '
                                  'field: ', fieldname)
 
-    run = xmltodict.parse(xml, force_list=['oml:file', 'oml:evaluation',
-                                           'oml:parameter_setting'])["oml:run"]
+    run, parameter_settings, input_dataset, output_data, tags = _iterparse_run_xml(xml)
     run_id = obtain_field(run, 'oml:run_id', from_server, cast=int)
     uploader = obtain_field(run, 'oml:uploader', from_server, cast=int)
     uploader_name = obtain_field(run, 'oml:uploader_name', from_server)
@@ -661,23 +830,21 @@ def _create_run_from_xml(xml, from_server=True):
         # parameters are only properly formatted once the flow is established on the server.
         # thus they are also not stored for runs with local flows.
         parameters = []
-        if 'oml:parameter_setting' in run:
-            obtained_parameter_settings = run['oml:parameter_setting']
-            for parameter_dict in obtained_parameter_settings:
-                current_parameter = OrderedDict()
-                current_parameter['oml:name'] = parameter_dict['oml:name']
-                current_parameter['oml:value'] = parameter_dict['oml:value']
-                if 'oml:component' in parameter_dict:
-                    current_parameter['oml:component'] = \
-                        parameter_dict['oml:component']
-                parameters.append(current_parameter)
+        for parameter_dict in parameter_settings:
+            current_parameter = OrderedDict()
+            current_parameter['oml:name'] = parameter_dict['oml:name']
+            current_parameter['oml:value'] = parameter_dict['oml:value']
+            if 'oml:component' in parameter_dict:
+                current_parameter['oml:component'] = \
+                    parameter_dict['oml:component']
+            parameters.append(current_parameter)
 
     flow_name = obtain_field(run, 'oml:flow_name', from_server)
     setup_id = obtain_field(run, 'oml:setup_id', from_server, cast=int)
     setup_string = obtain_field(run, 'oml:setup_string', from_server)
 
-    if 'oml:input_data' in run:
-        dataset_id = int(run['oml:input_data']['oml:dataset']['oml:did'])
+    if input_dataset is not None:
+        dataset_id = int(input_dataset['oml:did'])
     elif not from_server:
         dataset_id = None
     else:
@@ -690,15 +857,16 @@ def _create_run_from_xml(xml, from_server=True):
 
     files = OrderedDict()
     evaluations = OrderedDict()
-    fold_evaluations = OrderedDict()
-    sample_evaluations = OrderedDict()
-    if 'oml:output_data' not in run:
+    # (measure -> repeat -> fold -> value)
+    fold_evaluations = OrderedDict()  # type: OrderedDict[str, OrderedDict[int, OrderedDict]]
+    # (measure -> repeat -> fold -> sample -> value)
+    sample_evaluations = OrderedDict()  # type: OrderedDict[str, OrderedDict[int, OrderedDict]]
+    predictions_url = None
+    if output_data is None:
         if from_server:
             raise ValueError('Run does not contain output_data '
                              '(OpenML server error?)')
     else:
-        output_data = run['oml:output_data']
-        predictions_url = None
         if 'oml:file' in output_data:
             # multiple files, the normal case
             for file_dict in output_data['oml:file']:
@@ -723,21 +891,13 @@ def _create_run_from_xml(xml, from_server=True):
                     repeat = int(evaluation_dict['@repeat'])
                     fold = int(evaluation_dict['@fold'])
                     sample = int(evaluation_dict['@sample'])
-                    if key not in sample_evaluations:
-                        sample_evaluations[key] = OrderedDict()
-                    if repeat not in sample_evaluations[key]:
-                        sample_evaluations[key][repeat] = OrderedDict()
-                    if fold not in sample_evaluations[key][repeat]:
-                        sample_evaluations[key][repeat][fold] = OrderedDict()
-                    sample_evaluations[key][repeat][fold][sample] = value
+                    sample_evaluations.setdefault(key, OrderedDict()).setdefault(
+                        repeat, OrderedDict()).setdefault(fold, OrderedDict())[sample] = value
                 elif '@repeat' in evaluation_dict and '@fold' in evaluation_dict:
                     repeat = int(evaluation_dict['@repeat'])
                     fold = int(evaluation_dict['@fold'])
-                    if key not in fold_evaluations:
-                        fold_evaluations[key] = OrderedDict()
-                    if repeat not in fold_evaluations[key]:
-                        fold_evaluations[key][repeat] = OrderedDict()
-                    fold_evaluations[key][repeat][fold] = value
+                    fold_evaluations.setdefault(key, OrderedDict()).setdefault(
+                        repeat, OrderedDict())[fold] = value
                 else:
                     evaluations[key] = value
 
@@ -759,8 +919,6 @@ def _create_run_from_xml(xml, from_server=True):
             raise ValueError('No prediction files for run %d in run '
                              'description XML' % run_id)
 
-    tags = openml.utils.extract_xml_tags('oml:tag', run)
-
     return OpenMLRun(run_id=run_id, uploader=uploader,
                      uploader_name=uploader_name, task_id=task_id,
                      task_type=task_type,
@@ -775,6 +933,93 @@ def _create_run_from_xml(xml, from_server=True):
                      predictions_url=predictions_url)
 
 
+def _iterparse_run_xml(xml):
+    """Stream a run description into the parts used by ``_create_run_from_xml``.
+
+    The document is parsed incrementally and every element is cleared and
+    detached as soon as it has been consumed, so only the element currently
+    being parsed is held in memory. Repeated elements are returned in the
+    same shape ``xmltodict`` would produce for them (``oml:``-prefixed child
+    names and ``@``-prefixed attributes).
+
+    Parameters
+    ----------
+    xml : string
+        XML describing a run.
+
+    Returns
+    -------
+    fields : dict
+        Text of the scalar children of ``oml:run``.
+    parameter_settings : list
+        One dict per ``oml:parameter_setting``.
+    input_dataset : dict or None
+        The ``oml:input_data/oml:dataset`` element, if present.
+    output_data : dict or None
+        Lists of ``oml:file`` and ``oml:evaluation`` dicts, if
+        ``oml:output_data`` is present.
+    tags : list or None
+        The run's tags, if present.
+    """
+    fields = {}  # type: Dict[str, Optional[str]]
+    parameter_settings = []  # type: List[OrderedDict]
+    input_dataset = None  # type: Optional[OrderedDict]
+    output_data = None  # type: Optional[Dict[str, List[OrderedDict]]]
+    tags = []  # type: List[Optional[str]]
+
+    stack = []  # type: List[ElementTree.Element]
+    for event, elem in ElementTree.iterparse(io.BytesIO(xml.encode('utf8')),
+                                             events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            if len(stack) == 1 and elem.tag != OPENML_NAMESPACE + 'run':
+                raise ValueError('Run XML does not start with "oml:run": %s' % elem.tag)
+            elif len(stack) == 2 and elem.tag == OPENML_NAMESPACE + 'output_data':
+                output_data = OrderedDict()
+            continue
+
+        stack.pop()
+        if len(stack) == 1:
+            name = _oml_name(elem)
+            if name == 'oml:tag':
+                tags.append(_element_text(elem))
+            elif name == 'oml:parameter_setting':
+                parameter_settings.append(_element_to_dict(elem))
+            elif name not in ('oml:input_data', 'oml:output_data'):
+                fields[name] = _element_text(elem)
+        elif len(stack) == 2 and stack[1].tag == OPENML_NAMESPACE + 'output_data':
+            output_data.setdefault(_oml_name(elem), []).append(_element_to_dict(elem))
+        elif len(stack) == 2 and stack[1].tag == OPENML_NAMESPACE + 'input_data':
+            if elem.tag == OPENML_NAMESPACE + 'dataset':
+                input_dataset = _element_to_dict(elem)
+        else:
+            # nested deeper than the elements handled above, or the root;
+            # these are consumed (and freed) together with their parent
+            continue
+        elem.clear()
+        stack[-1].remove(elem)
+
+    return fields, parameter_settings, input_dataset, output_data, tags or None
+
+
+def _oml_name(elem):
+    return 'oml:' + elem.tag.rpartition('}')[2]
+
+
+def _element_text(elem):
+    # mirrors xmltodict, which strips whitespace and maps empty text to None
+    if elem.text is None:
+        return None
+    return elem.text.strip() or None
+
+
+def _element_to_dict(elem):
+    item = OrderedDict(('@' + key, value) for key, value in elem.attrib.items())
+    for child in elem:
+        item[_oml_name(child)] = _element_text(child)
+    return item
+
+
 def _get_cached_run(run_id):
     """Load a run from the cache."""
     run_cache_dir = openml.utils._create_cache_directory_for_id(
@@ -782,15 +1027,58 @@ def _get_cached_run(run_id):
     )
     try:
         run_file = os.path.join(run_cache_dir, "description.xml")
-        with io.open(run_file, encoding='utf8') as fh:
-            run = _create_run_from_xml(xml=fh.read())
-        return run
+        return _load_cached_run(run_file)
 
     except (OSError, IOError):
         raise OpenMLCacheException("Run file for run id %d not "
                                    "cached" % run_id)
 
 
+def _load_cached_run(run_file: str) -> OpenMLRun:
+    """Load a cached run description.
+
+    The parsed run is pickled next to the description, so that later calls
+    can skip parsing the XML. The pickle is ignored if it was written by a
+    different version of openml-python, does not hold a run or is older than
+    the description.
+    Every call returns a new run object.
+    """
+    description_mtime = os.path.getmtime(run_file)
+    pickle_file = _get_run_pickle_file(run_file)
+    try:
+        if os.path.getmtime(pickle_file) >= description_mtime:
+            with open(pickle_file, 'rb') as fh:
+                cached = pickle.load(fh)
+            # anything but a (version, run) pair of this version is treated like a missing pickle
+            if (isinstance(cached, tuple) and len(cached) == 2
+                    and cached[0] == openml.__version__ and isinstance(cached[1], OpenMLRun)):
+                return cached[1]
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError,
+            ImportError):
+        # The pickle file is missing, corrupt or was created by an incompatible
+        # version, we fall back to parsing the description below.
+        pass
+
+    with io.open(run_file, encoding='utf8') as fh:
+        run = _create_run_from_xml(xml=fh.read())
+    # write to a temporary file first, so that concurrent writers never leave a partial pickle
+    tmp_file = _get_temporary_file_name(pickle_file)
+    try:
+        with open(tmp_file, 'wb') as fh:
+            pickle.dump((openml.__version__, run), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, pickle_file)
+    except (OSError, pickle.PicklingError):
+        logger.debug("Could not pickle the cached run description %s." % run_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return run
+
+
+def _get_run_pickle_file(run_file: str) -> str:
+    return os.path.splitext(run_file)[0] + '.pkl.py3'
+
+
 def list_runs(
     offset: Optional[int] = None,
     size: Optional[int] = None,
@@ -845,11 +1133,90 @@ def list_runs(
     Returns
     -------
     dict of dicts, or dataframe
+
+    See Also
+    --------
+    iter_runs : Iterate over the same runs without collecting them first.
     """
     if output_format not in ['dataframe', 'dict']:
         raise ValueError("Invalid output format selected. "
                          "Only 'dict' or 'dataframe' applicable.")
 
+    runs = iter_runs(offset=offset,
+                     size=size,
+                     id=id,
+                     task=task,
+                     setup=setup,
+                     flow=flow,
+                     uploader=uploader,
+                     tag=tag,
+                     study=study,
+                     display_errors=display_errors,
+                     **kwargs)
+
+    if output_format == 'dataframe':
+        records = list(runs)
+        return pd.DataFrame(
+            records, index=[run_['run_id'] for run_ in records], columns=RUN_LISTING_COLUMNS,
+        )
+    return OrderedDict((run_['run_id'], run_) for run_ in runs)
+
+
+def iter_runs(
+    offset: Optional[int] = None,
+    size: Optional[int] = None,
+    id: Optional[List] = None,
+    task: Optional[List[int]] = None,
+    setup: Optional[List] = None,
+    flow: Optional[List] = None,
+    uploader: Optional[List] = None,
+    tag: Optional[str] = None,
+    study: Optional[int] = None,
+    display_errors: bool = False,
+    **kwargs
+) -> Iterator[Dict]:
+    """
+    Iterate over all runs matching all of the given filters.
+
+    Takes the same filters as :func:`list_runs`. The runs are requested page
+    by page and every page is parsed lazily, so a caller which stops early
+    does not download the remaining pages nor parse the rest of the current
+    one.
+
+    Parameters
+    ----------
+    offset : int, optional
+        the number of runs to skip, starting from the first
+    size : int, optional
+        the maximum number of runs to yield
+
+    id : list, optional
+
+    task : list, optional
+
+    setup: list, optional
+
+    flow : list, optional
+
+    uploader : list, optional
+
+    tag : str, optional
+
+    study : int, optional
+
+    display_errors : bool, optional (default=None)
+        Whether to list runs which have an error (for example a missing
+        prediction file).
+
+    kwargs : dict, optional
+        Legal filter operators: task_type. Additionally, the number of runs
+        requested per page can be set with batch_size.
+
+    Yields
+    ------
+    dict
+        One dict per run, with the keys of ``RUN_LISTING_COLUMNS``.
+    """
     if id is not None and (not isinstance(id, list)):
         raise TypeError('id must be of type list.')
     if task is not None and (not isinstance(task, list)):
@@ -861,32 +1228,68 @@ def list_runs(
     if uploader is not None and (not isinstance(uploader, list)):
         raise TypeError('uploader must be of type list.')
 
-    return openml.utils._list_all(output_format=output_format,
-                                  listing_call=_list_runs,
-                                  offset=offset,
-                                  size=size,
-                                  id=id,
-                                  task=task,
-                                  setup=setup,
-                                  flow=flow,
-                                  uploader=uploader,
-                                  tag=tag,
-                                  study=study,
-                                  display_errors=display_errors,
-                                  **kwargs)
+    batch_size = kwargs.pop('batch_size', None)
+    if batch_size is None:
+        batch_size = 10000
+    filters = {key: value for key, value in dict(tag=tag, **kwargs).items()
+               if value is not None}
+    # Serialize the id filters once, instead of once per page.
+    return _iter_run_pages(
+        offset=0 if offset is None else offset,
+        size=size,
+        batch_size=batch_size,
+        id=_filter_to_csv(id),
+        task=_filter_to_csv(task),
+        setup=_filter_to_csv(setup),
+        flow=_filter_to_csv(flow),
+        uploader=_filter_to_csv(uploader),
+        study=study,
+        display_errors=display_errors,
+        **filters
+    )
+
+
+def _iter_run_pages(
+    offset: int,
+    size: Optional[int],
+    batch_size: int,
+    **filters
+) -> Iterator[Dict]:
+    """Yield the runs of consecutive listing pages until ``size`` runs or the
+    last page have been reached."""
+    n_runs = 0
+    while size is None or n_runs < size:
+        limit = batch_size if size is None else min(batch_size, size - n_runs)
+        try:
+            page = _list_runs(limit=limit, offset=offset + n_runs, **filters)
+        except OpenMLServerNoResult:
+            return
+        n_page = 0
+        for run_ in page:
+            n_page += 1
+            yield run_
+        n_runs += n_page
+        if n_page < limit:
+            return
+
+
+def _filter_to_csv(ids: Optional[List]) -> Optional[str]:
+    """ Serialize a list of ids to the comma-separated form used in listing calls. """
+    if ids is None:
+        return None
+    return ','.join(map(str, map(int, ids)))
 
 
 def _list_runs(
-    id: Optional[List] = None,
-    task: Optional[List] = None,
-    setup: Optional[List] = None,
-    flow: Optional[List] = None,
-    uploader: Optional[List] = None,
+    id: Optional[str] = None,
+    task: Optional[str] = None,
+    setup: Optional[str] = None,
+    flow: Optional[str] = None,
+    uploader: Optional[str] = None,
     study: Optional[int] = None,
     display_errors: bool = False,
-    output_format: str = 'dict',
     **kwargs
-) -> Union[Dict, pd.DataFrame]:
+) -> Iterator[Dict]:
     """
     Perform API call `/run/list/{filters}'
     <https://www.openml.org/api_docs/#!/run/get_run_list_filters>`
@@ -898,15 +1301,17 @@ def _list_runs(
     display_errors is also separated from the kwargs since it has a
     default value.
 
-    id : list, optional
+    id : str, optional
+        The ids joined into a comma-separated string, see ``_filter_to_csv``.
+        The same holds for the other list filters.
 
-    task : list, optional
+    task : str, optional
 
-    setup: list, optional
+    setup: str, optional
 
-    flow : list, optional
+    flow : str, optional
 
-    uploader : list, optional
+    uploader : str, optional
 
     study : int, optional
 
@@ -914,77 +1319,79 @@ def _list_runs(
         Whether to list runs which have an error (for example a missing
         prediction file).
 
-    output_format: str, optional (default='dict')
-        The parameter decides the format of the output.
-        - If 'dict' the output is a dict of dict
-        - If 'dataframe' the output is a pandas DataFrame
-
     kwargs : dict, optional
         Legal filter operators: task_type.
 
     Returns
     -------
-    dict, or dataframe
-        List of found runs.
+    iterator of dicts
+        The found runs, parsed while iterating.
     """
 
-    api_call = "run/list"
+    api_call = ["run/list"]
     if kwargs is not None:
         for operator, value in kwargs.items():
-            api_call += "/%s/%s" % (operator, value)
+            api_call.append("%s/%s" % (operator, value))
     if id is not None:
-        api_call += "/run/%s" % ','.join([str(int(i)) for i in id])
+        api_call.append("run/%s" % id)
     if task is not None:
-        api_call += "/task/%s" % ','.join([str(int(i)) for i in task])
+        api_call.append("task/%s" % task)
     if setup is not None:
-        api_call += "/setup/%s" % ','.join([str(int(i)) for i in setup])
+        api_call.append("setup/%s" % setup)
     if flow is not None:
-        api_call += "/flow/%s" % ','.join([str(int(i)) for i in flow])
+        api_call.append("flow/%s" % flow)
     if uploader is not None:
-        api_call += "/uploader/%s" % ','.join([str(int(i)) for i in uploader])
+        api_call.append("uploader/%s" % uploader)
     if study is not None:
-        api_call += "/study/%d" % study
+        api_call.append("study/%d" % study)
     if display_errors:
-        api_call += "/show_errors/true"
-    return __list_runs(api_call=api_call, output_format=output_format)
+        api_call.append("show_errors/true")
+    return __list_runs(api_call="/".join(api_call))
 
 
-def __list_runs(api_call, output_format='dict'):
+def __list_runs(api_call):
     """Helper function to parse API calls which are lists of runs"""
+    # download eagerly, so that errors of the server are raised by this call already
     xml_string = openml._api_calls._perform_api_call(api_call, 'get')
-    runs_dict = xmltodict.parse(xml_string, force_list=('oml:run',))
+    return (
+        dict(zip(RUN_LISTING_COLUMNS, (
+            int(run_['oml:run_id']),
+            int(run_['oml:task_id']),
+            int(run_['oml:setup_id']),
+            int(run_['oml:flow_id']),
+            int(run_['oml:uploader']),
+            int(run_['oml:task_type_id']),
+            str(run_['oml:upload_time']),
+            str((run_['oml:error_message']) or ''),
+        )))
+        for run_ in _iterparse_run_listing(xml_string)
+    )
+
+
+def _iterparse_run_listing(xml_string):
+    """Yield the ``oml:run`` entries of a run listing one at a time.
+
+    The listing is parsed incrementally and every ``oml:run`` element is
+    dropped from the tree once it has been yielded, so large pages are never
+    held in memory as a whole. Entries are returned in the same shape as
+    ``xmltodict`` would produce them.
+    """
+    context = ElementTree.iterparse(
+        io.BytesIO(xml_string.encode('utf8')), events=('start', 'end'),
+    )
     # Minimalistic check if the XML is useful
-    if 'oml:runs' not in runs_dict:
+    _, root = next(context)
+    if _oml_name(root) != 'oml:runs':
         raise ValueError('Error in return XML, does not contain "oml:runs": %s'
-                         % str(runs_dict))
-    elif '@xmlns:oml' not in runs_dict['oml:runs']:
-        raise ValueError('Error in return XML, does not contain '
-                         '"oml:runs"/@xmlns:oml: %s'
-                         % str(runs_dict))
-    elif runs_dict['oml:runs']['@xmlns:oml'] != 'http://openml.org/openml':
+                         % xml_string)
+    elif root.tag != OPENML_NAMESPACE + 'runs':
         raise ValueError('Error in return XML, value of  '
                          '"oml:runs"/@xmlns:oml is not '
                          '"http://openml.org/openml": %s'
-                         % str(runs_dict))
-
-    assert type(runs_dict['oml:runs']['oml:run']) == list, \
-        type(runs_dict['oml:runs'])
-
-    runs = OrderedDict()
-    for run_ in runs_dict['oml:runs']['oml:run']:
-        run_id = int(run_['oml:run_id'])
-        run = {'run_id': run_id,
-               'task_id': int(run_['oml:task_id']),
-               'setup_id': int(run_['oml:setup_id']),
-               'flow_id': int(run_['oml:flow_id']),
-               'uploader': int(run_['oml:uploader']),
-               'task_type': int(run_['oml:task_type_id']),
-               'upload_time': str(run_['oml:upload_time']),
-               'error_message': str((run_['oml:error_message']) or '')}
-
-        runs[run_id] = run
-
-    if output_format == 'dataframe':
-        runs = pd.DataFrame.from_dict(runs, orient='index')
+                         % xml_string)
 
-    return runs
+    for event, elem in context:
+        if event == 'end' and elem.tag == OPENML_NAMESPACE + 'run':
+            yield _element_to_dict(elem)
+            elem.clear()
+            root.remove(elem)
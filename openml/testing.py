@@ -163,13 +163,8 @@ class TestBase(unittest.TestCase):
 
     def _add_sentinel_to_flow_name(self, flow, sentinel=None):
         sentinel = self._get_sentinel(sentinel=sentinel)
-        flows_to_visit = list()
-        flows_to_visit.append(flow)
-        while len(flows_to_visit) > 0:
-            current_flow = flows_to_visit.pop()
+        for current_flow in openml.flows.functions._walk_flows(flow):
             current_flow.name = '%s%s' % (sentinel, current_flow.name)
-            for subflow in current_flow.components.values():
-                flows_to_visit.append(subflow)
 
         return flow, sentinel
 
@@ -3,7 +3,8 @@
 import os
 import xmltodict
 import shutil
-from typing import TYPE_CHECKING, List, Tuple, Union, Type
+import threading
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union, Type
 import warnings
 import pandas as pd
 from functools import wraps
@@ -335,27 +336,45 @@ def _remove_cache_dir_for_id(key, cache_dir):
                          'Please do this manually!' % (key, cache_dir))
 
 
+# One lock per lock name, to serialize threads of the same process. The file locks of oslo only
+# exclude other processes.
+_thread_locks = {}  # type: Dict[str, threading.RLock]
+_thread_locks_lock = threading.Lock()
+
+
+def _get_thread_lock(lock_name: str) -> 'threading.RLock':
+    with _thread_locks_lock:
+        if lock_name not in _thread_locks:
+            _thread_locks[lock_name] = threading.RLock()
+        return _thread_locks[lock_name]
+
+
 def thread_safe_if_oslo_installed(func):
-    if oslo_installed:
-        @wraps(func)
-        def safe_func(*args, **kwargs):
-            # Lock directories use the id that is passed as either positional or keyword argument.
-            id_parameters = [parameter_name for parameter_name in kwargs if '_id' in parameter_name]
-            if len(id_parameters) == 1:
-                id_ = kwargs[id_parameters[0]]
-            elif len(args) > 0:
-                id_ = args[0]
-            else:
-                raise RuntimeError("An id must be specified for {}, was passed: ({}, {}).".format(
-                    func.__name__, args, kwargs
-                ))
-            # The [7:] gets rid of the 'openml.' prefix
-            lock_name = "{}.{}:{}".format(func.__module__[7:], func.__name__, id_)
-            with lockutils.external_lock(name=lock_name, lock_path=_create_lockfiles_dir()):
-                return func(*args, **kwargs)
-        return safe_func
-    else:
-        return func
+    """Serialize calls of ``func`` which are made for the same id.
+
+    Calls from threads of the same process are always serialized, calls from different
+    processes only if oslo.concurrency is installed.
+    """
+    @wraps(func)
+    def safe_func(*args, **kwargs):
+        # Lock directories use the id that is passed as either positional or keyword argument.
+        id_parameters = [parameter_name for parameter_name in kwargs if '_id' in parameter_name]
+        if len(id_parameters) == 1:
+            id_ = kwargs[id_parameters[0]]
+        elif len(args) > 0:
+            id_ = args[0]
+        else:
+            raise RuntimeError("An id must be specified for {}, was passed: ({}, {}).".format(
+                func.__name__, args, kwargs
+            ))
+        # The [7:] gets rid of the 'openml.' prefix
+        lock_name = "{}.{}:{}".format(func.__module__[7:], func.__name__, id_)
+        with _get_thread_lock(lock_name):
+            if oslo_installed:
+                with lockutils.external_lock(name=lock_name, lock_path=_create_lockfiles_dir()):
+                    return func(*args, **kwargs)
+            return func(*args, **kwargs)
+    return safe_func
 
 
 def _create_lockfiles_dir():
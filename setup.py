@@ -48,6 +48,7 @@ setuptools.setup(name="openml",
                      'xmltodict',
                      'requests',
                      'scikit-learn>=0.18',
+                     'joblib',
                      'python-dateutil',  # Installed through pandas anyway.
                      'pandas>=1.0.0',
                      'scipy>=0.13.3',
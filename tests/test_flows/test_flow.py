@@ -1,6 +1,7 @@
 # License: BSD 3-Clause
 
 import collections
+import concurrent.futures
 import copy
 from distutils.version import LooseVersion
 import hashlib
@@ -31,6 +32,18 @@ from openml.testing import TestBase, SimpleImputer
 import openml.utils
 
 
+_EMPTY_LINE_PATTERN = re.compile(r'^$')
+
+
+def _normalize_xml(xml):
+    """ Remove the formatting differences between a local and a server flow xml. """
+    xml = (
+        xml.replace('  ', '').replace('\t', '').
+        strip().replace('\n\n', '\n').replace('&quot;', '"')
+    )
+    return _EMPTY_LINE_PATTERN.sub('', xml)
+
+
 class TestFlow(TestBase):
     _multiprocess_can_split_ = True
 
@@ -52,21 +65,21 @@ class TestFlow(TestBase):
         self.assertEqual(len(flow.parameters), 24)
         self.assertEqual(len(flow.components), 1)
 
-        subflow_1 = list(flow.components.values())[0]
+        subflow_1 = next(iter(flow.components.values()))
         self.assertIsInstance(subflow_1, openml.OpenMLFlow)
         self.assertEqual(subflow_1.flow_id, 4025)
         self.assertEqual(len(subflow_1.parameters), 14)
         self.assertEqual(subflow_1.parameters['E'], 'CC')
         self.assertEqual(len(subflow_1.components), 1)
 
-        subflow_2 = list(subflow_1.components.values())[0]
+        subflow_2 = next(iter(subflow_1.components.values()))
         self.assertIsInstance(subflow_2, openml.OpenMLFlow)
         self.assertEqual(subflow_2.flow_id, 4026)
         self.assertEqual(len(subflow_2.parameters), 13)
         self.assertEqual(subflow_2.parameters['I'], '10')
         self.assertEqual(len(subflow_2.components), 1)
 
-        subflow_3 = list(subflow_2.components.values())[0]
+        subflow_3 = next(iter(subflow_2.components.values()))
         self.assertIsInstance(subflow_3, openml.OpenMLFlow)
         self.assertEqual(subflow_3.flow_id, 1724)
         self.assertEqual(len(subflow_3.parameters), 11)
@@ -117,24 +130,20 @@ class TestFlow(TestBase):
         # TODO maybe get this via get_flow(), which would have to be refactored
         # to allow getting only the xml dictionary
         # TODO: no sklearn flows.
-        for flow_id in [3, 5, 7, 9, ]:
-            flow_xml = _perform_api_call("flow/%d" % flow_id,
-                                         request_method='get')
-            flow_dict = xmltodict.parse(flow_xml)
+        flow_ids = [3, 5, 7, 9, ]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(flow_ids)) as executor:
+            flow_xmls = list(executor.map(
+                lambda flow_id: _perform_api_call("flow/%d" % flow_id, request_method='get'),
+                flow_ids,
+            ))
+        for flow_xml in flow_xmls:
+            flow_dict = xmltodict.parse(flow_xml, dict_constructor=dict)
 
             flow = openml.OpenMLFlow._from_dict(flow_dict)
             new_xml = flow._to_xml()
 
-            flow_xml = (
-                flow_xml.replace('  ', '').replace('\t', '').
-                strip().replace('\n\n', '\n').replace('&quot;', '"')
-            )
-            flow_xml = re.sub(r'^$', '', flow_xml)
-            new_xml = (
-                new_xml.replace('  ', '').replace('\t', '').
-                strip().replace('\n\n', '\n').replace('&quot;', '"')
-            )
-            new_xml = re.sub(r'^$', '', new_xml)
+            flow_xml = _normalize_xml(flow_xml)
+            new_xml = _normalize_xml(new_xml)
 
             self.assertEqual(new_xml, flow_xml)
 
@@ -149,7 +158,7 @@ class TestFlow(TestBase):
         # end of setup
 
         xml = flow._to_xml()
-        xml_dict = xmltodict.parse(xml)
+        xml_dict = xmltodict.parse(xml, dict_constructor=dict)
         new_flow = openml.flows.OpenMLFlow._from_dict(xml_dict)
 
         # Would raise exception if they are not legal
@@ -327,11 +336,8 @@ class TestFlow(TestBase):
             # Create a unique prefix for the flow. Necessary because the flow
             # is identified by its name and external version online. Having a
             # unique name allows us to publish the same flow in each test run
-            md5 = hashlib.md5()
-            md5.update(str(time.time()).encode('utf-8'))
-            sentinel = md5.hexdigest()[:10]
-            sentinel = 'TEST%s' % sentinel
-            return sentinel
+            digest = hashlib.blake2b(str(time.time()).encode('utf-8'), digest_size=5)
+            return 'TEST%s' % digest.hexdigest()
 
         name = get_sentinel() + get_sentinel()
         version = get_sentinel()
@@ -407,18 +413,16 @@ class TestFlow(TestBase):
             'boosting__learning_rate': scipy.stats.uniform(0.01, 0.99),
             'boosting__base_estimator__max_depth': scipy.stats.randint(1, 10),
         }
-        cv = sklearn.model_selection.StratifiedKFold(n_splits=5, shuffle=True)
+        # The search only needs to be fitted, keep it as small as possible
+        cv = sklearn.model_selection.StratifiedKFold(n_splits=2, shuffle=True)
         rs = sklearn.model_selection.RandomizedSearchCV(
-            estimator=model, param_distributions=parameter_grid, cv=cv)
+            estimator=model, param_distributions=parameter_grid, cv=cv, n_iter=1)
         rs.fit(X, y)
         flow = self.extension.model_to_flow(rs)
         # Tags may be sorted in any order (by the server). Just using one tag
         # makes sure that the xml comparison does not fail because of that.
-        subflows = [flow]
-        while len(subflows) > 0:
-            f = subflows.pop()
+        for f in openml.flows.functions._walk_flows(flow):
             f.tags = []
-            subflows.extend(list(f.components.values()))
 
         flow, sentinel = self._add_sentinel_to_flow_name(flow, None)
 
@@ -436,20 +440,14 @@ class TestFlow(TestBase):
         local_xml = flow._to_xml()
         server_xml = new_flow._to_xml()
 
-        for i in range(10):
+        local_xml = local_xml.replace(sentinel, '')
+        server_xml = server_xml.replace(sentinel, '')
+        previous = None
+        while previous != (local_xml, server_xml):
             # Make sure that we replace all occurences of two newlines
-            local_xml = local_xml.replace(sentinel, '')
-            local_xml = (
-                local_xml.replace('  ', '').replace('\t', '').
-                strip().replace('\n\n', '\n').replace('&quot;', '"')
-            )
-            local_xml = re.sub(r'(^$)', '', local_xml)
-            server_xml = server_xml.replace(sentinel, '')
-            server_xml = (
-                server_xml.replace('  ', '').replace('\t', '').
-                strip().replace('\n\n', '\n').replace('&quot;', '"')
-            )
-            server_xml = re.sub(r'^$', '', server_xml)
+            previous = local_xml, server_xml
+            local_xml = _normalize_xml(local_xml)
+            server_xml = _normalize_xml(server_xml)
 
         self.assertEqual(server_xml, local_xml)
 
@@ -479,13 +477,13 @@ class TestFlow(TestBase):
 
     def test_extract_tags(self):
         flow_xml = "<oml:tag>study_14</oml:tag>"
-        flow_dict = xmltodict.parse(flow_xml)
+        flow_dict = xmltodict.parse(flow_xml, dict_constructor=dict)
         tags = openml.utils.extract_xml_tags('oml:tag', flow_dict)
         self.assertEqual(tags, ['study_14'])
 
         flow_xml = "<oml:flow><oml:tag>OpenmlWeka</oml:tag>\n" \
                    "<oml:tag>weka</oml:tag></oml:flow>"
-        flow_dict = xmltodict.parse(flow_xml)
+        flow_dict = xmltodict.parse(flow_xml, dict_constructor=dict)
         tags = openml.utils.extract_xml_tags('oml:tag', flow_dict['oml:flow'])
         self.assertEqual(tags, ['OpenmlWeka', 'weka'])
 
@@ -499,7 +497,7 @@ class TestFlow(TestBase):
         self.assertEqual(len(flow.components), 1)
         self.assertIsNone(flow.model)
 
-        subflow_1 = list(flow.components.values())[0]
+        subflow_1 = next(iter(flow.components.values()))
         self.assertIsInstance(subflow_1, openml.OpenMLFlow)
         self.assertEqual(subflow_1.flow_id, 6743)
         self.assertEqual(len(subflow_1.parameters), 8)
@@ -507,7 +505,7 @@ class TestFlow(TestBase):
         self.assertEqual(len(subflow_1.components), 1)
         self.assertIsNone(subflow_1.model)
 
-        subflow_2 = list(subflow_1.components.values())[0]
+        subflow_2 = next(iter(subflow_1.components.values()))
         self.assertIsInstance(subflow_2, openml.OpenMLFlow)
         self.assertEqual(subflow_2.flow_id, 5888)
         self.assertEqual(len(subflow_2.parameters), 4)
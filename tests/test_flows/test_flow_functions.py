@@ -80,19 +80,28 @@ class TestFlowFunctions(TestBase):
             for did in flows:
                 self._check_flow(flows[did])
 
+    def _create_test_flow(self, **kwargs):
+        """ Create a flow without components for the flow comparison tests.
+
+        Keyword arguments are passed to ``OpenMLFlow`` and overwrite the defaults.
+        """
+        flow_kwargs = dict(name='Test',
+                           description='Test flow',
+                           model=None,
+                           components=OrderedDict(),
+                           parameters=OrderedDict(),
+                           parameters_meta_info=OrderedDict(),
+                           external_version='1',
+                           tags=['abc', 'def'],
+                           language='English',
+                           dependencies='abc',
+                           class_name='Test',
+                           custom_name='Test')
+        flow_kwargs.update(kwargs)
+        return openml.flows.OpenMLFlow(**flow_kwargs)
+
     def test_are_flows_equal(self):
-        flow = openml.flows.OpenMLFlow(name='Test',
-                                       description='Test flow',
-                                       model=None,
-                                       components=OrderedDict(),
-                                       parameters=OrderedDict(),
-                                       parameters_meta_info=OrderedDict(),
-                                       external_version='1',
-                                       tags=['abc', 'def'],
-                                       language='English',
-                                       dependencies='abc',
-                                       class_name='Test',
-                                       custom_name='Test')
+        flow = self._create_test_flow()
 
         # Test most important values that can be set by a user
         openml.flows.functions.assert_flows_equal(flow, flow)
@@ -161,20 +170,8 @@ class TestFlowFunctions(TestBase):
         paramaters = OrderedDict((('a', 5), ('b', 6)))
         parameters_meta_info = OrderedDict((('a', None), ('b', None)))
 
-        flow = openml.flows.OpenMLFlow(
-            name='Test',
-            description='Test flow',
-            model=None,
-            components=OrderedDict(),
-            parameters=paramaters,
-            parameters_meta_info=parameters_meta_info,
-            external_version='1',
-            tags=['abc', 'def'],
-            language='English',
-            dependencies='abc',
-            class_name='Test',
-            custom_name='Test',
-        )
+        flow = self._create_test_flow(parameters=paramaters,
+                                      parameters_meta_info=parameters_meta_info)
 
         openml.flows.functions.assert_flows_equal(flow, flow)
         openml.flows.functions.assert_flows_equal(flow, flow,
@@ -216,19 +213,9 @@ class TestFlowFunctions(TestBase):
         flow_upload_date = '2017-01-31T12-01-01'
         assert_flows_equal = openml.flows.functions.assert_flows_equal
 
-        flow = openml.flows.OpenMLFlow(name='Test',
-                                       description='Test flow',
-                                       model=None,
-                                       components=OrderedDict(),
-                                       parameters=paramaters,
-                                       parameters_meta_info=parameters_meta_info,
-                                       external_version='1',
-                                       tags=['abc', 'def'],
-                                       language='English',
-                                       dependencies='abc',
-                                       class_name='Test',
-                                       custom_name='Test',
-                                       upload_date=flow_upload_date)
+        flow = self._create_test_flow(parameters=paramaters,
+                                      parameters_meta_info=parameters_meta_info,
+                                      upload_date=flow_upload_date)
 
         assert_flows_equal(flow, flow, ignore_parameter_values_on_older_children=flow_upload_date)
         assert_flows_equal(flow, flow, ignore_parameter_values_on_older_children=None)
@@ -1,3 +1,8 @@
+import concurrent.futures
+import unittest.mock
+
+import requests
+
 import openml
 import openml.testing
 
@@ -10,3 +15,45 @@ class TestConfig(openml.testing.TestBase):
             'URI too long!',
         ):
             openml.datasets.list_datasets(data_id=list(range(10000)))
+
+    def test_session_is_reused_per_thread(self):
+        session = openml._api_calls._get_session()
+        self.assertIs(openml._api_calls._get_session(), session)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            other_session = executor.submit(openml._api_calls._get_session).result()
+        self.assertIsNot(other_session, session)
+
+        openml._api_calls._close_session()
+        self.assertIsNot(openml._api_calls._get_session(), session)
+
+    def test_session_does_not_keep_state_between_calls(self):
+        session = openml._api_calls._get_session()
+        session.cookies.set('name', 'value')
+        self.assertIs(openml._api_calls._get_session(), session)
+        self.assertEqual(len(session.cookies), 0)
+
+        with unittest.mock.patch.object(openml.config, 'server', 'https://www.openml.org'):
+            self.assertIsNot(openml._api_calls._get_session(), session)
+        session = openml._api_calls._get_session()
+        with unittest.mock.patch.object(openml.config, 'apikey', 'other'):
+            self.assertIsNot(openml._api_calls._get_session(), session)
+
+    @unittest.mock.patch('time.sleep')
+    def test_session_is_renewed_after_connection_error(self, sleep_mock):
+        sessions = []
+        response = unittest.mock.Mock(status_code=200, text='response',
+                                      headers={'Content-Encoding': 'gzip'})
+
+        def get(session, url, params):
+            sessions.append(session)
+            if len(sessions) == 1:
+                raise requests.exceptions.ConnectionError()
+            return response
+
+        with unittest.mock.patch.object(requests.Session, 'get', autospec=True,
+                                        side_effect=get):
+            with unittest.mock.patch.object(openml.config, 'connection_n_retries', 2):
+                response_text = openml._api_calls._perform_api_call('data/list', 'get')
+        self.assertEqual(response_text, 'response')
+        self.assertEqual(len(sessions), 2)
+        self.assertIsNot(sessions[0], sessions[1])
@@ -3,10 +3,13 @@
 import arff
 from distutils.version import LooseVersion
 import os
+import pickle
 import random
+import shutil
 import time
 import sys
 import unittest.mock
+from xml.etree import ElementTree
 
 import numpy as np
 import pytest
@@ -44,6 +47,37 @@ from sklearn.model_selection import RandomizedSearchCV, GridSearchCV, \
 from sklearn.pipeline import Pipeline
 
 
+class _InMemoryClassificationTask(openml.tasks.OpenMLClassificationTask):
+    """ Classification task on given data and splits, which needs no server and can be pickled.
+
+    ``splits`` maps ``(repeat, fold)`` to the train and test indices.
+    """
+
+    def __init__(self, X, y, splits, class_labels):
+        super().__init__(
+            task_type_id=TaskTypeEnum.SUPERVISED_CLASSIFICATION,
+            task_type='Supervised Classification',
+            data_set_id=1,
+            target_name='class',
+            task_id=1,
+            class_labels=class_labels,
+        )
+        self._X = X
+        self._y = y
+        self._splits = splits
+
+    def get_X_and_y(self, dataset_format='array'):
+        return self._X, self._y
+
+    def get_split_dimensions(self):
+        n_repeats = max(repeat for repeat, _ in self._splits) + 1
+        n_folds = max(fold for _, fold in self._splits) + 1
+        return n_repeats, n_folds, 1
+
+    def get_train_test_split_indices(self, fold=0, repeat=0, sample=0):
+        return self._splits[(repeat, fold)]
+
+
 class TestRun(TestBase):
     _multiprocess_can_split_ = True
     # diabetis dataset, 768 observations, 0 missing vals, 33% holdout set
@@ -944,6 +978,23 @@ class TestRun(TestBase):
             run_ids = run_exists(task.task_id, setup_exists)
             self.assertTrue(run_ids, msg=(run_ids, clf))
 
+    @unittest.mock.patch('openml.runs.functions.list_runs')
+    def test_run_exists_many(self, list_runs_mock):
+        list_runs_mock.return_value = {
+            10: {'run_id': 10, 'setup_id': 1},
+            11: {'run_id': 11, 'setup_id': 2},
+            12: {'run_id': 12, 'setup_id': 1},
+        }
+        run_ids = openml.runs.run_exists_many(115, [1, 2, 3, 0])
+        list_runs_mock.assert_called_once_with(task=[115], setup=[1, 2, 3])
+        self.assertEqual(run_ids, {1: {10, 12}, 2: {11}})
+        self.assertEqual(run_exists(115, 1), {10, 12})
+        self.assertEqual(run_exists(115, 3), set())
+
+        list_runs_mock.reset_mock()
+        self.assertEqual(openml.runs.run_exists_many(115, [0, -1]), {})
+        list_runs_mock.assert_not_called()
+
     def test_run_with_illegal_flow_id(self):
         # check the case where the user adds an illegal flow id to a
         # non-existing flow
@@ -1059,6 +1110,71 @@ class TestRun(TestBase):
             loaded_run.publish
         )
 
+    @unittest.mock.patch('openml.runs.functions.run_exists')
+    @unittest.mock.patch('openml.runs.functions.setup_exists')
+    @unittest.mock.patch('openml.runs.functions.get_flow')
+    @unittest.mock.patch('openml.runs.functions.flow_exists')
+    def test_run_flow_on_task_reuses_known_flow_id(self, flow_exists_mock, get_flow_mock,
+                                                   setup_exists_mock, run_exists_mock):
+        def get_flow(flow_id):
+            flow_from_server = self.extension.model_to_flow(DecisionTreeClassifier())
+            flow_from_server.flow_id = flow_id
+            return flow_from_server
+
+        flow_exists_mock.return_value = 42
+        get_flow_mock.side_effect = get_flow
+        setup_exists_mock.return_value = 7
+        run_exists_mock.return_value = {1}
+        task = unittest.mock.Mock()
+        task.task_id = 115
+        flow = self.extension.model_to_flow(DecisionTreeClassifier())
+
+        with unittest.mock.patch.dict(openml.runs.functions._server_flow_ids, clear=True):
+            for _ in range(2):
+                with self.assertRaises(openml.exceptions.OpenMLRunsExistError):
+                    openml.runs.run_flow_on_task(flow=flow, task=task)
+                self.assertEqual(flow.flow_id, 42)
+            flow_exists_mock.assert_called_once_with(flow.name, flow.external_version)
+
+            # an id that was not confirmed by the server is still checked
+            flow.flow_id = -1
+            with self.assertRaisesRegex(openml.exceptions.PyOpenMLError,
+                                        "Local flow_id does not match server flow_id"):
+                openml.runs.run_flow_on_task(flow=flow, task=task)
+            self.assertEqual(flow_exists_mock.call_count, 2)
+
+    def test__run_task_get_arffcontent_n_jobs(self):
+        rng = np.random.RandomState(1)
+        X = rng.rand(40, 3)
+        y = rng.randint(0, 3, 40)
+        splits = {
+            (0, 0): (np.arange(20, 40), np.arange(0, 20)),
+            (0, 1): (np.arange(0, 20), np.arange(20, 40)),
+            (1, 0): (np.arange(0, 40, 2), np.arange(1, 40, 2)),
+            (1, 1): (np.arange(1, 40, 2), np.arange(0, 40, 2)),
+        }
+        task = _InMemoryClassificationTask(X, y, splits, class_labels=['a', 'b', 'c'])
+        flow = unittest.mock.Mock()
+        flow.name = 'dummy'
+
+        results = []
+        # the default backend runs the folds in other processes, which requires the task,
+        # the model and the extension to be picklable
+        for n_jobs in (None, 2):
+            results.append(_run_task_get_arffcontent(
+                flow=flow,
+                model=DecisionTreeClassifier(random_state=1),
+                task=task,
+                extension=self.extension,
+                add_local_measures=True,
+                n_jobs=n_jobs,
+            ))
+        (data, _, fold_evaluations, _), (data_parallel, _, fold_evaluations_parallel, _) = results
+        self.assertEqual(len(data), 80)
+        self.assertEqual(data_parallel, data)
+        self.assertEqual(fold_evaluations_parallel['predictive_accuracy'],
+                         fold_evaluations['predictive_accuracy'])
+
     def test__run_task_get_arffcontent(self):
         task = openml.tasks.get_task(7)
         num_instances = 3196
@@ -1164,6 +1280,86 @@ class TestRun(TestBase):
         runs = openml.runs.list_runs(size=1000, output_format='dataframe')
         self.assertIsInstance(runs, pd.DataFrame)
 
+    @unittest.mock.patch('openml._api_calls._perform_api_call')
+    def test_list_runs_parses_listing(self, api_call_mock):
+        run_xml = (
+            '<oml:run><oml:run_id>%d</oml:run_id><oml:task_id>115</oml:task_id>'
+            '<oml:setup_id>1</oml:setup_id><oml:flow_id>2</oml:flow_id>'
+            '<oml:uploader>3</oml:uploader><oml:task_type_id>1</oml:task_type_id>'
+            '<oml:upload_time>2019-01-01 00:00:00</oml:upload_time>'
+            '<oml:error_message>%s</oml:error_message></oml:run>'
+        )
+        api_call_mock.return_value = (
+            '<oml:runs xmlns:oml="http://openml.org/openml">%s%s</oml:runs>'
+            % (run_xml % (10, ''), run_xml % (11, 'failed'))
+        )
+        runs = openml.runs.list_runs(task=[115])
+        self.assertEqual(list(runs), [10, 11])
+        for rid in runs:
+            self._check_run(runs[rid])
+        self.assertEqual(runs[10]['error_message'], '')
+        self.assertEqual(runs[11]['error_message'], 'failed')
+        self.assertEqual(runs[11]['task_id'], 115)
+
+        api_call_mock.return_value = (
+            '<oml:runs xmlns:oml="http://openml.org/other">%s</oml:runs>'
+            % (run_xml % (10, ''))
+        )
+        with self.assertRaisesRegex(ValueError, 'http://openml.org/openml'):
+            openml.runs.list_runs(task=[115])
+
+    @unittest.mock.patch('openml._api_calls._perform_api_call')
+    def test_list_runs_serializes_filters_once(self, api_call_mock):
+        run_xml = (
+            '<oml:run><oml:run_id>%d</oml:run_id><oml:task_id>115</oml:task_id>'
+            '<oml:setup_id>1</oml:setup_id><oml:flow_id>2</oml:flow_id>'
+            '<oml:uploader>3</oml:uploader><oml:task_type_id>1</oml:task_type_id>'
+            '<oml:upload_time>2019-01-01 00:00:00</oml:upload_time>'
+            '<oml:error_message></oml:error_message></oml:run>'
+        )
+        api_call_mock.side_effect = [
+            '<oml:runs xmlns:oml="http://openml.org/openml">%s</oml:runs>' % (run_xml % i)
+            for i in range(3)
+        ]
+        filter_to_csv = openml.runs.functions._filter_to_csv
+        with unittest.mock.patch('openml.runs.functions._filter_to_csv',
+                                 wraps=filter_to_csv) as filter_to_csv_mock:
+            runs = openml.runs.list_runs(task=[115, 116], size=3, batch_size=1)
+        self.assertEqual(list(runs), [0, 1, 2])
+        # once for each of the five id filters, not once per filter and page
+        self.assertEqual(filter_to_csv_mock.call_count, 5)
+        self.assertEqual(
+            [call[0][0] for call in api_call_mock.call_args_list],
+            ['run/list/limit/1/offset/%d/task/115,116' % i for i in range(3)],
+        )
+
+    @unittest.mock.patch('openml._api_calls._perform_api_call')
+    def test_iter_runs_stops_early(self, api_call_mock):
+        run_xml = (
+            '<oml:run><oml:run_id>%d</oml:run_id><oml:task_id>115</oml:task_id>'
+            '<oml:setup_id>1</oml:setup_id><oml:flow_id>2</oml:flow_id>'
+            '<oml:uploader>3</oml:uploader><oml:task_type_id>1</oml:task_type_id>'
+            '<oml:upload_time>2019-01-01 00:00:00</oml:upload_time>'
+            '<oml:error_message></oml:error_message></oml:run>'
+        )
+        api_call_mock.side_effect = [
+            '<oml:runs xmlns:oml="http://openml.org/openml">%s</oml:runs>'
+            % ''.join(run_xml % (2 * page + i) for i in range(2))
+            for page in range(3)
+        ]
+        with self.assertRaisesRegex(TypeError, 'task must be of type list.'):
+            openml.runs.iter_runs(task=115)
+        api_call_mock.assert_not_called()
+
+        runs = openml.runs.iter_runs(task=[115], batch_size=2)
+        self.assertEqual([next(runs)['run_id'] for _ in range(3)], [0, 1, 2])
+        runs.close()
+        # the third page was never requested
+        self.assertEqual(
+            [call[0][0] for call in api_call_mock.call_args_list],
+            ['run/list/limit/2/offset/%d/task/115' % i for i in (0, 2)],
+        )
+
     def test_get_runs_list_by_task(self):
         # TODO: comes from live, no such lists on test
         openml.config.server = self.production_server
@@ -1302,11 +1498,118 @@ class TestRun(TestBase):
         openml.config.cache_directory = self.static_cache_dir
         openml.runs.functions._get_cached_run(1)
 
+    def test_get_cached_run_does_not_reparse(self):
+        run_dir = openml.utils._create_cache_directory_for_id('runs', 1)
+        shutil.copy(
+            os.path.join(self.static_cache_dir, 'org', 'openml', 'test', 'runs', '1',
+                         'description.xml'),
+            run_dir,
+        )
+        run = openml.runs.functions._get_cached_run(1)
+        with unittest.mock.patch('openml.runs.functions._create_run_from_xml') as parse_mock:
+            cached_run = openml.runs.functions._get_cached_run(1)
+        parse_mock.assert_not_called()
+        self.assertEqual(cached_run.run_id, run.run_id)
+        # changing a returned run must not affect later calls
+        self.assertIsNot(cached_run, run)
+
+    def test_get_cached_run_reparses_modified_description(self):
+        run_file = os.path.join(self.workdir, 'description.xml')
+        shutil.copy(
+            os.path.join(self.static_cache_dir, 'org', 'openml', 'test', 'runs', '1',
+                         'description.xml'),
+            run_file,
+        )
+        mtime = os.path.getmtime(run_file)
+        openml.runs.functions._load_cached_run(run_file)
+
+        os.utime(run_file, (mtime + 10, mtime + 10))
+        with unittest.mock.patch('openml.runs.functions._create_run_from_xml') as parse_mock:
+            parse_mock.return_value = 'reparsed'
+            self.assertEqual(openml.runs.functions._load_cached_run(run_file), 'reparsed')
+
+    def test_get_cached_run_uses_pickle(self):
+        # only the extension of the description is replaced, not '.xml' elsewhere in the path
+        run_dir = os.path.join(self.workdir, 'runs.xml_cache')
+        os.mkdir(run_dir)
+        run_file = os.path.join(run_dir, 'description.xml')
+        shutil.copy(
+            os.path.join(self.static_cache_dir, 'org', 'openml', 'test', 'runs', '1',
+                         'description.xml'),
+            run_file,
+        )
+        pickle_file = os.path.join(run_dir, 'description.pkl.py3')
+        run = openml.runs.functions._load_cached_run(run_file)
+        self.assertEqual(sorted(os.listdir(run_dir)), ['description.pkl.py3', 'description.xml'])
+
+        with unittest.mock.patch('openml.runs.functions._create_run_from_xml') as parse_mock:
+            unpickled_run = openml.runs.functions._load_cached_run(run_file)
+        parse_mock.assert_not_called()
+        self.assertEqual(unpickled_run.run_id, run.run_id)
+        self.assertEqual(unpickled_run.parameter_settings, run.parameter_settings)
+
+        # a pickle of another version is ignored and overwritten
+        with open(pickle_file, 'wb') as fh:
+            pickle.dump(('0.0.0', None), fh)
+        self.assertEqual(openml.runs.functions._load_cached_run(run_file).run_id, run.run_id)
+        with open(pickle_file, 'rb') as fh:
+            self.assertEqual(pickle.load(fh)[0], openml.__version__)
+
+        # as is a pickle which does not hold a (version, run) pair
+        for cached in [1, (openml.__version__,), (openml.__version__, None)]:
+            with open(pickle_file, 'wb') as fh:
+                pickle.dump(cached, fh)
+            self.assertEqual(openml.runs.functions._load_cached_run(run_file).run_id, run.run_id)
+
+    @unittest.mock.patch('openml._api_calls._perform_api_call')
+    def test_get_run_caches_parsed_description(self, api_call_mock):
+        with open(os.path.join(self.static_cache_dir, 'org', 'openml', 'test', 'runs', '1',
+                               'description.xml'), encoding='utf8') as fh:
+            run_xml = fh.read()
+        run_dir = openml.utils._create_cache_directory_for_id('runs', 1)
+        run_file = os.path.join(run_dir, 'description.xml')
+
+        # a description which cannot be parsed is not cached
+        api_call_mock.return_value = '<oml:run xmlns:oml="http://openml.org/openml">'
+        with self.assertRaises(ElementTree.ParseError):
+            openml.runs.get_run(1, ignore_cache=True)
+        self.assertFalse(os.path.exists(run_file))
+
+        api_call_mock.return_value = run_xml
+        run = openml.runs.get_run(1, ignore_cache=True)
+        self.assertEqual(run.run_id, 100)
+        self.assertEqual(os.listdir(run_dir), ['description.xml'])
+        with open(run_file, encoding='utf8') as fh:
+            self.assertEqual(fh.read(), run_xml)
+        # the description is created with the default permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(run_file).st_mode & 0o777, 0o666 & ~umask)
+
+        # the temporary file is removed if the description cannot be written
+        with unittest.mock.patch('os.replace', side_effect=OSError):
+            with self.assertRaises(OSError):
+                openml.runs.get_run(1, ignore_cache=True)
+        self.assertEqual(os.listdir(run_dir), ['description.xml'])
+
     def test_get_uncached_run(self):
         openml.config.cache_directory = self.static_cache_dir
         with self.assertRaises(openml.exceptions.OpenMLCacheException):
             openml.runs.functions._get_cached_run(10)
 
+    @unittest.mock.patch('openml.runs.functions.get_run')
+    def test_get_runs_keeps_order(self, get_run_mock):
+        get_run_mock.side_effect = lambda run_id: 'run_%d' % run_id
+        with unittest.mock.patch.object(openml.config, 'n_download_workers', 3):
+            runs = openml.runs.get_runs([5, 3, 1, 4, 2])
+        self.assertEqual(runs, ['run_5', 'run_3', 'run_1', 'run_4', 'run_2'])
+        self.assertEqual(openml.runs.get_runs([]), [])
+
+        get_run_mock.reset_mock()
+        runs = openml.runs.get_runs([2, 1, 2, 2])
+        self.assertEqual(runs, ['run_2', 'run_1', 'run_2', 'run_2'])
+        self.assertEqual(sorted(call[0][0] for call in get_run_mock.call_args_list), [1, 2])
+
     def test_run_flow_on_task_downloaded_flow(self):
         model = sklearn.ensemble.RandomForestClassifier(n_estimators=33)
         flow = self.extension.model_to_flow(model)
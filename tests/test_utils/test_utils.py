@@ -2,6 +2,9 @@ from openml.testing import TestBase
 import numpy as np
 import openml
 import sys
+import threading
+import time
+import concurrent.futures
 
 if sys.version_info[0] >= 3:
     from unittest import mock
@@ -89,3 +92,22 @@ class OpenMLTaskTest(TestBase):
 
         # might not be on test server after reset, please rerun test at least once if fails
         self.assertEqual(len(evaluations), required_size)
+
+    def test_thread_safe_serializes_threads_per_id(self):
+        active = {1: 0, 2: 0}
+        max_active = {1: 0, 2: 0}
+        lock = threading.Lock()
+
+        def get_entity(entity_id):
+            with lock:
+                active[entity_id] += 1
+                max_active[entity_id] = max(max_active[entity_id], active[entity_id])
+            time.sleep(0.01)
+            with lock:
+                active[entity_id] -= 1
+
+        get_entity.__module__ = 'openml.test_utils'
+        safe_get_entity = openml.utils.thread_safe_if_oslo_installed(get_entity)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(safe_get_entity, [1, 2] * 8))
+        self.assertEqual(max_active, {1: 1, 2: 1})